@@ -10,7 +10,10 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterator, List
+
+# Fixed processing timestamp used by the simulated batch results
+_TIMESTAMP = "2024-01-01T00:00:00Z"
 
 
 def migrate(config_path: str = "config.json") -> bool:
@@ -67,16 +70,16 @@ def validate(data_path: str) -> Dict[str, Any]:
 
     # Simulate validation
     if path.is_dir():
-        files = list(path.glob("**/*.json"))
-        results["total_files"] = len(files)
-        results["valid_files"] = len(files)  # All valid in simulation
+        count = sum(1 for _ in path.rglob("*.json"))
+        results["total_files"] = count
+        results["valid_files"] = count  # All valid in simulation
     else:
         results["errors"].append(f"Not a directory: {data_path}")
 
     return results
 
 
-def process_batch(items: List[str], batch_size: int = 10) -> List[Dict[str, Any]]:
+def process_batch(items: List[str], batch_size: int = 10) -> Iterator[Dict[str, Any]]:
     """
     Process items in batches.
 
@@ -84,19 +87,15 @@ def process_batch(items: List[str], batch_size: int = 10) -> List[Dict[str, Any]
         items: List of items to process
         batch_size: Number of items per batch
 
-    Returns:
-        List of processing results
+    Yields:
+        Processing result for each item; wrap in list() to collect them
     """
-    results = []
-
     for i in range(0, len(items), batch_size):
         batch = items[i : i + batch_size]
         print(f"Processing batch {i // batch_size + 1}: {len(batch)} items")
 
         for item in batch:
-            results.append({"item": item, "status": "processed", "timestamp": "2024-01-01T00:00:00Z"})
-
-    return results
+            yield {"item": item, "status": "processed", "timestamp": _TIMESTAMP}
 
 
 def main():